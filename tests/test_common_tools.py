@@ -0,0 +1,340 @@
+import threading
+import time
+import zipfile
+
+import pytest
+
+from updatechecker import common_tools as tools
+
+
+def test_unzip_file(tmp_path):
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        _zip.writestr('stored.txt', 'stored' * 1000, compress_type=zipfile.ZIP_STORED)
+        _zip.writestr('folder/deflated.txt', 'deflated' * 1000, compress_type=zipfile.ZIP_DEFLATED)
+        _zip.writestr('../escaped.txt', 'escaped')
+
+    destination = tmp_path / 'out'
+    tools.unzip_file(archive, destination)
+    assert (destination / 'stored.txt').read_text() == 'stored' * 1000
+    assert (destination / 'folder' / 'deflated.txt').read_text() == 'deflated' * 1000
+    assert (destination / 'escaped.txt').read_text() == 'escaped'
+
+
+def test_unzip_file_empty_filename(tmp_path):
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        _zip.writestr('../..', 'nameless')
+
+    with pytest.raises(ValueError):
+        tools.unzip_file(archive, tmp_path / 'out')
+
+
+def test_unzip_file_bad_crc(tmp_path):
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        _zip.writestr('stored.txt', 'stored' * 1000, compress_type=zipfile.ZIP_STORED)
+    data = archive.read_bytes()
+    archive.write_bytes(data.replace(b'stored' * 1000, b'STORED' + b'stored' * 999))
+
+    with pytest.raises(zipfile.BadZipFile):
+        tools.unzip_file(archive, tmp_path / 'out')
+
+
+def test_unzip_file_partial_sendfile(tmp_path, monkeypatch):
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        _zip.writestr('stored.txt', 'stored' * 1000, compress_type=zipfile.ZIP_STORED)
+
+    sendfile = tools.os.sendfile
+    calls = []
+
+    def partial_sendfile(out_fd, in_fd, offset, count):
+        calls.append(count)
+        return sendfile(out_fd, in_fd, offset, 100) if len(calls) == 1 else 0
+
+    monkeypatch.setattr(tools.os, 'sendfile', partial_sendfile)
+    tools.unzip_file(archive, tmp_path / 'out')
+    assert (tmp_path / 'out' / 'stored.txt').read_text() == 'stored' * 1000
+
+
+def test_unzip_file_no_members(tmp_path):
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        _zip.writestr('file.txt', 'file')
+
+    tools.unzip_file(archive, tmp_path / 'out', members=[])
+    assert not (tmp_path / 'out' / 'file.txt').exists()
+
+
+def test_unzip_file_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, 'available_cpus', lambda: 4)
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as _zip:
+        for i in range(10):
+            _zip.writestr(f'folder{i % 3}/file{i}.txt', f'file{i}' * 1000)
+
+    destination = tmp_path / 'out'
+    tools.unzip_file(archive, destination)
+    for i in range(10):
+        assert (destination / f'folder{i % 3}' / f'file{i}.txt').read_text() == f'file{i}' * 1000
+
+
+@pytest.mark.filterwarnings('ignore:Duplicate name')
+def test_unzip_file_parallel_duplicate_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, 'available_cpus', lambda: 4)
+    archive = tmp_path / 'archive.zip'
+    with zipfile.ZipFile(archive, 'w') as _zip:
+        for i in range(10):
+            _zip.writestr('file.txt', f'file{i}' * 1000)
+
+    tools.unzip_file(archive, tmp_path / 'out')
+    assert (tmp_path / 'out' / 'file.txt').read_text() == 'file9' * 1000
+
+
+def test_is_filename_archive():
+    assert tools.is_filename_archive('d912pxy.ZIP')
+    assert tools.is_filename_archive('archive.7z')
+    assert not tools.is_filename_archive('file.zip.exe')
+
+
+def test_calculate_chunks():
+    assert list(tools.calculate_chunks(25, chunk_size=10)) == [(0, 9), (10, 19), (20, 24)]
+    assert list(tools.calculate_chunks(20, chunk_size=10)) == [(0, 9), (10, 19)]
+    assert list(tools.calculate_chunks(0, chunk_size=10)) == []
+    assert tools.chunk_count(25, chunk_size=10) == 3
+    assert tools.chunk_count(20, chunk_size=10) == 2
+    assert tools.chunk_count(0, chunk_size=10) == 0
+
+
+def test_git_package_to_releases_etag(tmp_path, monkeypatch):
+    class Response:
+        def __init__(self, status_code, content=b'', headers=None):
+            self.status_code = status_code
+            self.content = content
+            self.headers = headers or {}
+
+    requests_headers = []
+
+    def get(url, headers=None):
+        requests_headers.append(headers)
+        if headers.get('If-None-Match') == '"etag"':
+            return Response(304)
+        return Response(200, b'[{"tag_name": "v1"}]', {'ETag': '"etag"'})
+
+    monkeypatch.setattr(tools.constants, 'RELEASES_CACHE_FILE', tmp_path / 'releases.json')
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    assert tools.git_package_to_releases('owner/repo') == [{'tag_name': 'v1'}]
+    assert tools.git_package_to_releases('owner/repo') == [{'tag_name': 'v1'}]
+    assert requests_headers == [{}, {'If-None-Match': '"etag"'}]
+
+
+def test_git_package_to_releases_rate_limit(tmp_path, monkeypatch):
+    class Response:
+        status_code = 403
+        content = b'{"message": "API rate limit exceeded"}'
+        headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+
+    monkeypatch.setattr(tools.constants, 'RELEASES_CACHE_FILE', tmp_path / 'releases.json')
+    monkeypatch.setattr(tools._SESSION, 'get', lambda url, headers=None: Response())
+    assert tools.git_package_to_releases('owner/repo', max_wait=0) is None
+
+
+class _DownloadResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_download_if_modified(tmp_path, monkeypatch):
+    requests_headers = []
+
+    def get(url, headers=None, **kwargs):
+        requests_headers.append(headers.get('If-None-Match'))
+        if headers.get('If-None-Match') == '"etag"':
+            return _DownloadResponse(304)
+        return _DownloadResponse(200, b'content', {'ETag': '"etag"'})
+
+    monkeypatch.setattr(tools.constants, 'DOWNLOADS_CACHE_FILE', tmp_path / 'downloads.json')
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    url = 'https://example.com/file.zip'
+    destination = tmp_path / 'file.zip'
+    md5 = tools.download_if_modified(url, destination, chunked=False)
+    assert destination.read_bytes() == b'content'
+    assert md5 == tools.md5sum(destination)
+
+    destination.unlink()
+    assert tools.download_if_modified(url, destination, chunked=False) == md5
+    assert tools.download_if_modified(url, destination, chunked=True) == md5
+    assert not destination.exists()
+    assert requests_headers == [None, '"etag"', '"etag"']
+
+
+def test_download_if_modified_no_validators(tmp_path, monkeypatch):
+    requests_headers = []
+
+    def get(url, headers=None, **kwargs):
+        requests_headers.append(headers)
+        return _DownloadResponse(200, b'content')
+
+    monkeypatch.setattr(tools.constants, 'DOWNLOADS_CACHE_FILE', tmp_path / 'downloads.json')
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    url = 'https://example.com/file.zip'
+    destination = tmp_path / 'file.zip'
+    assert tools.download_if_modified(url, destination, chunked=False) is not None
+    assert tools.download_if_modified(url, destination, chunked=False) is not None
+    assert requests_headers == [tools._BINARY_HEADERS, tools._BINARY_HEADERS]
+
+
+def test_download_if_modified_request_error(tmp_path, monkeypatch):
+    def get(url, headers=None, **kwargs):
+        raise tools.requests.ConnectionError('unreachable')
+
+    monkeypatch.setattr(tools.constants, 'DOWNLOADS_CACHE_FILE', tmp_path / 'downloads.json')
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    destination = tmp_path / 'file.zip'
+    assert tools.download_if_modified('https://example.com/file.zip', destination, chunked=False) is None
+    assert not destination.exists()
+
+
+def test_download_file_from_url_failed_range(tmp_path, monkeypatch):
+    chunk_size = tools.constants.DEFAULT_CHUNK_SIZE
+    size = 4 * chunk_size
+
+    class Response:
+        status_code = 206
+        url = 'https://example.com/file.zip'
+
+        def __init__(self, start, end):
+            self.headers = {'Content-Range': f'bytes {start}-{end}/{size}'}
+            self.data = b'x' * (end - start + 1)
+
+        def iter_content(self, chunk_size):
+            yield self.data
+
+        def close(self):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    cancelled = threading.Event()
+
+    class ThreadPoolExecutor(tools.ThreadPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            if cancel_futures:
+                cancelled.set()
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    requested_starts = []
+
+    def get(url, headers=None, **kwargs):
+        start, end = map(int, headers['Range'].removeprefix('bytes=').split('-'))
+        requested_starts.append(start)
+        if start == chunk_size:
+            raise tools.requests.ConnectionError('connection reset')
+        if start > chunk_size:  # the range that is already running when the download fails
+            assert cancelled.wait(timeout=5)
+        return Response(start, end)
+
+    monkeypatch.setattr(tools, 'ThreadPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(tools.constants, 'DOWNLOAD_WORKERS', 1)
+    monkeypatch.setattr(tools.constants, 'DOWNLOAD_RETRY_DELAY', 0)
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    destination = tmp_path / 'file.zip'
+    assert tools.download_file_from_url('https://example.com/file.zip', destination) is None
+    assert not destination.exists()
+    assert requested_starts.count(chunk_size) == tools.constants.DOWNLOAD_RETRIES + 1
+    # the last range was cancelled before it started
+    assert 3 * chunk_size not in requested_starts
+
+
+def test_git_package_to_releases_secondary_rate_limit(tmp_path, monkeypatch):
+    class Response:
+        def __init__(self, status_code, content, headers):
+            self.status_code = status_code
+            self.content = content
+            self.headers = headers
+
+    responses = [Response(403, b'{"message": "secondary rate limit"}', {'Retry-After': '0'}),
+                 Response(403, b'{"message": "forbidden"}', {})]
+    monkeypatch.setattr(tools.constants, 'RELEASES_CACHE_FILE', tmp_path / 'releases.json')
+    monkeypatch.setattr(tools._SESSION, 'get', lambda url, headers=None: responses.pop(0))
+    assert tools.git_package_to_releases('owner/repo') is None
+    assert responses == []
+
+
+def test_download_chunk_short_writes(tmp_path, monkeypatch):
+    class Response:
+        status_code = 206
+
+        def iter_content(self, chunk_size):
+            yield b'0123456789'
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    write_at = tools._write_at
+    monkeypatch.setattr(tools, '_write_at', lambda fd, data, offset: write_at(fd, data[:3], offset))
+    destination = tmp_path / 'file.bin'
+    destination.write_bytes(b'\0' * 10)
+    tools.download_chunk('https://example.com/file.bin', destination, (0, 9), response=Response())
+    assert destination.read_bytes() == b'0123456789'
+
+
+def test_cached_md5sum(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.constants, 'HASHES_FILE', tmp_path / 'hashes.jsonl')
+    test_file = tmp_path / 'file.bin'
+    test_file.write_bytes(b'content')
+    md5 = tools.md5sum(test_file)
+    assert tools.cached_md5sum(test_file) == md5
+
+    monkeypatch.setattr(tools, 'md5sum', lambda path: None)
+    assert tools.cached_md5sum(test_file) == md5
+
+    test_file.write_bytes(b'changed content')
+    assert tools.cached_md5sum(test_file) is None
+
+
+def test_record_md5(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.constants, 'HASHES_FILE', tmp_path / 'hashes.jsonl')
+    test_file = tmp_path / 'file.bin'
+    test_file.write_bytes(b'content')
+    tools.record_md5(test_file, 'recorded')
+    monkeypatch.setattr(tools, 'md5sum', lambda path: None)
+    assert tools.cached_md5sum(test_file) == 'recorded'
+
+
+def test_hashes_log_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools.constants, 'HASHES_FILE', tmp_path / 'hashes.jsonl')
+    test_file = tmp_path / 'file.bin'
+    test_file.write_bytes(b'content')
+    for md5 in ('first', 'second', 'third'):
+        tools.record_md5(test_file, md5)
+    assert len(tools.constants.HASHES_FILE.read_text().splitlines()) == 3
+
+    assert tools.cached_md5sum(test_file) == 'third'
+    assert len(tools.constants.HASHES_FILE.read_text().splitlines()) == 1
+    assert tools.cached_md5sum(test_file) == 'third'
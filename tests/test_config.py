@@ -10,3 +10,21 @@ def test_example_config():
         **config_kwargs,
     )
     config.validators.validate_all()
+
+
+def test_entry_validator_cache():
+    from updatechecker.config import entry_validator, _validate_entry
+
+    entries = {'entry': {'url': 'https://example.com/file.zip', 'target': '.'}}
+    _validate_entry.cache_clear()
+    entry_validator(entries)
+    entry_validator(entries)
+    assert _validate_entry.cache_info().hits == 1
+
+
+def test_parse_entries():
+    from updatechecker.config import parse_entries
+
+    entries = parse_entries({'entry': {'url': 'https://example.com/file.zip', 'target': '.'}})
+    assert [entry.name for entry in entries] == ['entry']
+    assert entries[0].target == Path('.')
@@ -0,0 +1,36 @@
+from updatechecker import __main__ as main, common_tools as tools
+from updatechecker.config import Entry
+
+
+def test_process_entry_failed_download(tmp_path, monkeypatch):
+    target = tmp_path / 'file.zip'
+    target.write_bytes(b'old content')
+    temp_folder = tmp_path / 'temp'
+    temp_folder.mkdir()
+
+    def get(url, headers=None, **kwargs):
+        raise tools.requests.ConnectionError('connection reset')
+
+    recorded = []
+    monkeypatch.setattr(main.constants, 'ensure_temp_folder', lambda: temp_folder)
+    monkeypatch.setattr(tools.constants, 'DOWNLOADS_CACHE_FILE', tmp_path / 'downloads.json')
+    monkeypatch.setattr(tools._SESSION, 'get', get)
+    monkeypatch.setattr(tools, 'record_md5', lambda path, md5: recorded.append(md5))
+
+    main.process_entry(Entry(name='entry', url='https://example.com/file.zip', target=target))
+    assert target.read_bytes() == b'old content'
+    assert recorded == []
+    assert not (temp_folder / 'file.zip').exists()
+    assert not (tmp_path / 'downloads.json').exists()
+
+
+def test_process_entry_failed_first_download(tmp_path, monkeypatch):
+    target = tmp_path / 'file.zip'
+    calls = []
+    monkeypatch.setattr(tools, 'download_file_from_url', lambda source, destination, chunked=True: None)
+    monkeypatch.setattr(main, 'process_archive', lambda entry: calls.append('process_archive'))
+    monkeypatch.setattr(main.subprocess, 'Popen', lambda *args, **kwargs: calls.append('launch'))
+    monkeypatch.setattr(main.os, 'startfile', lambda *args, **kwargs: calls.append('launch'), raising=False)
+
+    main.process_entry(Entry(name='entry', url='https://example.com/file.zip', target=target, launch='app'))
+    assert calls == []
@@ -1,19 +1,19 @@
 import os
-import pprint
+import shlex
 import shutil
+import subprocess
+from concurrent.futures import as_completed
 from concurrent.futures.thread import ThreadPoolExecutor
-from pathlib import Path
-import psutil as psutil
-from updatechecker.logger import Log
+from updatechecker.logger import Log, PrettyLog
 from updatechecker import constants, common_tools as tools
-from updatechecker.config import config, Entry
+from updatechecker.config import get_config, parse_entries
 
 log = Log.getLogger(__name__)
 
 
 def process_entry(entry):
     log.printer(f"Processing entry '{entry.name}'")
-    log.debug(f"{pprint.pformat(entry.model_dump())}")
+    log.debug("%s", PrettyLog(entry))
     url = entry.url
     url_md5 = entry.md5
     git_asset = entry.git_asset
@@ -21,20 +21,27 @@ def process_entry(entry):
     arguments = entry.arguments
     kill_if_locked = entry.kill_if_locked
     relaunch = entry.relaunch
+    chunked = entry.chunked_download
 
     def _launch(launch_, arguments_=None):
-        __cmd = f'start "" {launch_} {arguments_ or ""}'
-        log.debug(f"Launching {__cmd}")
-        os.system(__cmd)
+        log.debug("Launching %s %s", launch_, arguments_ or '')
+        if hasattr(os, 'startfile'):
+            os.startfile(launch_, arguments=arguments_ or '')
+        else:
+            subprocess.Popen([launch_, *shlex.split(arguments_ or '')], start_new_session=True)
 
     if git_asset is not None:
-        log.debug(f"Trying git package for git asset {git_asset}")
+        log.debug("Trying git package for git asset %s", git_asset)
         git_package = tools.url_get_git_package(url)
         if git_package is None:
             log.warning("Url is not for a file and not a git package. Cannot proceed")
             return
 
-        releases = tools.git_package_to_releases(git_package)
+        releases = tools.git_package_to_releases(git_package, per_page=1)
+        if not releases:
+            log.warning(f"Couldn't get releases of git package '{git_package}'")
+            return
+
         release = tools.git_latest_release(releases)
         url = tools.git_release_get_asset_url(release, git_asset)
 
@@ -44,20 +51,21 @@ def process_entry(entry):
         return
 
     target = entry.target
-    target = Path(target)
     if target.is_dir():
         entry.target = target = target / url_file
 
     if not target.exists():
-        log.debug(f"Target '{target}' doesn't exist. Just downloading url")
-        tools.download_file_from_url(url, target)
+        log.debug("Target '%s' doesn't exist. Just downloading url", target)
+        if tools.download_file_from_url(url, target, chunked=chunked) is None:
+            log.warning(f"Couldn't download '{url}' to '{target}'")
+            return
+
         process_archive(entry)
         if launch:
             _launch(launch, arguments)
         return
 
-    target_md5 = tools.md5sum(target)
-    temp_file = constants.TEMP_FOLDER / url_file
+    temp_file = constants.ensure_temp_folder() / url_file
 
     def del_temp():
         if temp_file.exists():
@@ -66,23 +74,29 @@ def process_entry(entry):
     del_temp()
 
     if url_md5 is None:
-        tools.download_file_from_url(url, temp_file)
-        url_md5 = tools.md5sum(temp_file)
+        # a conditional download spares downloading an unchanged url again just to hash it
+        url_md5 = tools.download_if_modified(url, temp_file, chunked=chunked)
+        if url_md5 is None:
+            log.warning(f"Couldn't download '{url}' to check it for updates")
+            del_temp()
+            return
     else:
         url_md5 = tools.read_url(url_md5)
         url_md5 = url_md5.split(' ')[0]
 
-    if target_md5 == url_md5:
+    # the target is only hashed once there is an url md5 to compare it against
+    target_md5 = tools.cached_md5sum(target) if url_md5 is not None else None
+    if url_md5 is not None and target_md5 == url_md5:
         log.printer(f"No need to update '{target}'", color=False)
         del_temp()
         return
 
-    log.debug(f"md5 url vs target: '{url_md5}' '{target_md5}'")
+    log.debug("md5 url vs target: '%s' '%s'", url_md5, target_md5)
     log.printer(f"Updating {target}")
 
-    bak_file = Path(target.with_suffix('.bak'))
+    bak_file = target.with_suffix('.bak')
     if bak_file.exists():
-        log.debug(f"Deleting old backup for '{target}'")
+        log.debug("Deleting old backup for '%s'", target)
         bak_file.unlink()
 
     killed = False
@@ -99,20 +113,24 @@ def process_entry(entry):
             killed = True
 
     if temp_file.exists():
-        log.debug(f"Moving '{temp_file}' to '{target}'")
+        log.debug("Moving '%s' to '%s'", temp_file, target)
         shutil.move(str(temp_file), str(target))
         del_temp()
+        # url_md5 was hashed from this very download, no need to hash the target again on the next check
+        tools.record_md5(target, url_md5)
+        updated = True
     else:
-        tools.download_file_from_url(url, target)
+        updated = tools.download_file_from_url(url, target, chunked=chunked) is not None
 
-    process_archive(entry)
-    if not target.exists() and bak_file.exists():
-        bak_file.rename(target)
+    if updated:
+        process_archive(entry)
+    elif bak_file.exists():
+        # replace, not rename: a failed download may have left a partial target behind
+        bak_file.replace(target)
 
     if killed is True:
         if relaunch is True and kill_if_locked is not None:
-            _cmd = f"{kill_if_locked} {arguments or ''}"
-            os.system(kill_if_locked)
+            _launch(kill_if_locked, arguments)
     elif launch:
         _launch(launch, arguments)
 
@@ -121,7 +139,7 @@ def process_archive(entry):
     kill_if_locked = entry.kill_if_locked
     unzip_target = entry.unzip_target
     archive_password = entry.archive_password
-    target = Path(entry.target)
+    target = entry.target
 
     if tools.is_filename_archive(target.name) and unzip_target is not None:
         try:
@@ -141,12 +159,16 @@ def process_archive(entry):
 
 
 def main(_async=True, threads=None):
-    config_entries = [Entry(**config_entry, name=config_entry_name)
-                      for config_entry_name, config_entry in config.entries.items()]
+    config_entries = parse_entries(get_config().entries)
     if _async:
-        threads = threads or psutil.cpu_count() - 1
+        threads = threads or max(1, tools.available_cpus() - 1)
         with ThreadPoolExecutor(max_workers=threads) as executor:
-            executor.map(process_entry, config_entries)
+            futures = {executor.submit(process_entry, entry): entry for entry in config_entries}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    log.error(f"Couldn't process entry '{futures[future].name}': {type(e)} {e}")
     else:
         for entry in config_entries:
             process_entry(entry)
@@ -155,6 +177,6 @@ def main(_async=True, threads=None):
 if __name__ == '__main__':
     log.verbose = True
     _async = os.getenv('update_checker_dbg', None) is None
-    log.debug(f"Async: {_async}")
+    log.debug("Async: %s", _async)
     main(_async=_async)
     pass
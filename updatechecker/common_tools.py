@@ -1,21 +1,46 @@
 import hashlib
+import json
 import os
 import re
-import urllib.request
+import shutil
+import struct
+import threading
+import time
 import zipfile
-from functools import partial
+import zlib
+from concurrent.futures.thread import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from urllib.parse import urlparse
-from urllib.request import urlretrieve
 
-import psutil as psutil
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
 
 from updatechecker import constants
 from updatechecker.logger import Log
 
 log = Log.getLogger(__name__)
 
+_GITHUB_PACKAGE_RE = re.compile(r'(?<=github\.com/)[^/]+/[^/]+')
+
+# binary assets are streamed to disk as is: no content decoding, and range offsets match the file bytes
+_BINARY_HEADERS = {'Accept-Encoding': 'identity'}
+
+_SESSION = requests.Session()
+# keep enough idle connections per host so parallel chunk workers reuse them instead of reconnecting
+_SESSION.mount('http://', HTTPAdapter(pool_maxsize=constants.HTTP_POOL_SIZE))
+_SESSION.mount('https://', HTTPAdapter(pool_maxsize=constants.HTTP_POOL_SIZE))
+
 
 def process_running(executeable=None, exe_path=None, cmdline=None):
     """ Returns a list of running processes with executeable equals name and/or full path to executeable equals path
@@ -28,6 +53,13 @@ def process_running(executeable=None, exe_path=None, cmdline=None):
     :type cmdline: str
     :rtype: list
     """
+    # imported on demand: only entries with a locked target need to look at processes
+    import psutil
+
+    if exe_path is not None:
+        # both sides are normalized the same way, without resolving links, like the Path comparison did
+        exe_path = os.path.normcase(os.path.normpath(exe_path))
+
     process_iter = psutil.process_iter()
     output_processes = []
     for process in process_iter:
@@ -45,7 +77,7 @@ def process_running(executeable=None, exe_path=None, cmdline=None):
             except:
                 continue
 
-            if Path(process_path) == Path(exe_path):
+            if os.path.normcase(os.path.normpath(process_path)) == exe_path:
                 append = True
             else:
                 continue
@@ -82,8 +114,8 @@ def url_get_git_package(url: str) -> str | None:
     :return:
     """
     if 'github' in url:
-        url = re.search('(?<=github.com/)[^/]+/[^/]+', url).group(0)
-    request = requests.get(f'https://github.com/{url}/tags.atom')
+        url = _GITHUB_PACKAGE_RE.search(url).group(0)
+    request = _SESSION.get(f'https://github.com/{url}/tags.atom')
     if request.status_code != 200:
         log.warning(f'{url} is not a valid github url/package')
         return None
@@ -91,10 +123,84 @@ def url_get_git_package(url: str) -> str | None:
     return url
 
 
-def git_package_to_releases(package):
+_RELEASES_CACHE_LOCK = threading.Lock()
+
+
+def _read_json_cache(path):
+    try:
+        return json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _rate_limit_wait(response):
+    """ Returns how many seconds to wait for the GitHub API rate limit reset or None if the response isn't limited.
+    Secondary rate limits tell the wait in Retry-After, the primary one in X-RateLimit-Reset.
+    """
+    if response.status_code not in (403, 429):
+        return None
+
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return int(retry_after)
+
+    reset = response.headers.get('X-RateLimit-Reset', '')
+    if response.headers.get('X-RateLimit-Remaining') != '0' or not reset.isdigit():
+        return None
+
+    return max(0, int(reset) - time.time()) + 1
+
+
+def git_package_to_releases(package, per_page=None, max_wait=constants.GITHUB_RATE_LIMIT_MAX_WAIT):
+    """ Returns the releases of the github package, newest first.
+    Conditional requests against the cached ETag don't count against the GitHub API rate limit when unchanged.
+
+    :param package: github package in the form of 'owner/repo'
+    :param per_page: fetch only this many newest releases instead of the default first page of 30
+    :param max_wait: seconds to wait for the API rate limit reset; a wait as long or longer gives up
+    :rtype: list | None
+    """
     releases_url = f"https://api.github.com/repos/{package}/releases"
-    output = requests.get(url=releases_url)
-    output = output.json()
+    if per_page is not None:
+        releases_url = f"{releases_url}?per_page={per_page}"
+    with _RELEASES_CACHE_LOCK:
+        cached = _read_json_cache(constants.RELEASES_CACHE_FILE).get(releases_url)
+
+    headers = {}
+    if cached is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = _SESSION.get(url=releases_url, headers=headers)
+    wait = _rate_limit_wait(response)
+    if wait is not None:
+        if wait >= max_wait:
+            log.warning(f"GitHub API rate limit exceeded for '{package}' for the next {wait:.0f} seconds")
+            return None
+
+        log.printer(f"GitHub API rate limit exceeded. Waiting {wait:.0f} seconds for it to reset", color=False)
+        time.sleep(wait)
+        return git_package_to_releases(package, per_page=per_page, max_wait=0)
+
+    if response.status_code == 304 and cached is not None:
+        log.debug("Releases of '%s' are not modified since the last check", package)
+        return cached['releases']
+
+    if response.status_code != 200:
+        log.warning(f"Couldn't get releases of '{package}': {response.status_code} {response.content[:200]!r}")
+        return None
+
+    output = json_loads(response.content)
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        with _RELEASES_CACHE_LOCK:
+            cache = _read_json_cache(constants.RELEASES_CACHE_FILE)
+            cache[releases_url] = dict(etag=etag, last_modified=last_modified, releases=output)
+            constants.ensure_temp_folder()
+            constants.RELEASES_CACHE_FILE.write_bytes(json_dumps(cache))
     return output
 
 
@@ -102,36 +208,30 @@ def git_latest_release(releases):
     return releases[0]
 
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern):
+    return re.compile(pattern)
+
+
 def git_release_get_asset_url(release, asset_name):
     assets = release.get('assets')
     if assets is None:
         log.warning(f"Couldn't get asset url for '{asset_name}'")
         return
 
-    matching_assets = list(filter(lambda f: re.match(asset_name, f.get('name')) is not None, assets))
+    asset_re = _compile_pattern(asset_name)
+    matching_assets = [asset for asset in assets if asset_re.match(asset.get('name')) is not None]
     if not any(matching_assets):
         log.warning(f"There are no assets of name '{asset_name}' @ '{release.get('url')}")
         return
 
     asset = matching_assets[0]
     output = asset.get('browser_download_url')
-    log.debug(f"Returning url for asset '{asset_name}': '{output}'")
+    log.debug("Returning url for asset '%s': '%s'", asset_name, output)
     return output
 
 
-def url_accessible(_url):
-    try:
-        urlopen = urllib.request.urlopen(_url)
-        getcode = urlopen.getcode()
-    except:
-        getcode = None
-
-    output = getcode == 200
-    log.debug(f"url '{_url}' accessible: {output}")
-    return output
-
-
-def md5sum(path):
+def md5sum(path, chunked=True):
     if not isinstance(path, Path):
         try:
             Path(path).exists()
@@ -140,61 +240,388 @@ def md5sum(path):
             pass
 
     if not isinstance(path, Path):
-        log.debug(f"Getting md5 of an url '{path}'")
-        if not url_accessible(path):
-            log.warning(f"Cannot get an md5 of the url '{path}': url is not accessible")
-            return None
-
+        log.debug("Getting md5 of an url '%s'", path)
         filename = url_to_filename(path)
         if filename is None:
             log.warning(f"Cannot get md5 from url '{path}': couldn't get filename from url")
             return None
 
-        temp_file_path = constants.TEMP_FOLDER / filename
+        temp_file_path = constants.ensure_temp_folder() / filename
         if temp_file_path.exists():
             temp_file_path.unlink()
 
-        downloaded_file = download_file_from_url(path, temp_file_path)
+        downloaded_file = download_file_from_url(path, temp_file_path, chunked=chunked)
         if downloaded_file is None or not downloaded_file.exists():
             log.warning(f"Couldn't get url '{path}' md5: couldn't download it to file '{downloaded_file}'")
             return None
 
         path = downloaded_file
 
-    if not path.exists():
+    log.debug("Getting md5 of '%s'", path)
+    try:
+        with path.open('rb') as f:
+            d = hashlib.file_digest(f, partial(hashlib.md5, usedforsecurity=False))
+    except FileNotFoundError:
         log.warning("Cannot get md5sum: md5 file doesn't exist")
         return None
 
-    log.debug(f"Getting md5 of '{path}'")
-    with path.open('rb') as f:
-        d = hashlib.md5()
-        for buf in iter(partial(f.read, 128), b''):
-            d.update(buf)
     output = d.hexdigest()
     return output
 
 
-def download_file_from_url(source, destination):
-    def basic_progress(blocknum, bs, size):
-        if blocknum % 10 == 0:
+_HASHES_LOCK = threading.Lock()
+
+
+def cached_md5sum(path):
+    """ Returns the md5 of the file, reusing the one recorded in HASHES_FILE while the file size and
+    modification time stay the same
+
+    :type path: Path | str
+    :rtype: str | None
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return md5sum(path)
+
+    key = str(path.absolute())
+    with _HASHES_LOCK:
+        cached = _read_hashes().get(key)
+    if cached is not None and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        log.debug("Using the recorded md5 of '%s'", path)
+        return cached['md5']
+
+    output = md5sum(path)
+    if output is not None:
+        _store_md5(key, stat, output)
+    return output
+
+
+def record_md5(path, md5):
+    """ Records an already known md5 of the file, so cached_md5sum doesn't hash it again
+
+    :type path: Path | str
+    :type md5: str
+    """
+    path = Path(path)
+    _store_md5(str(path.absolute()), path.stat(), md5)
+
+
+def _read_hashes():
+    """ Returns the latest HASHES_FILE record of every path, compacting the log once it is mostly superseded records
+
+    :rtype: dict
+    """
+    try:
+        lines = constants.HASHES_FILE.read_bytes().splitlines()
+    except OSError:
+        return {}
+
+    hashes = {}
+    for line in lines:
+        try:
+            record = json_loads(line)
+            hashes[record.pop('path')] = record
+        except (ValueError, KeyError):  # a line torn by an interrupted write
+            continue
+
+    if len(lines) > 2 * len(hashes):
+        compacted = constants.HASHES_FILE.with_suffix('.tmp')
+        compacted.write_bytes(b''.join(json_dumps(dict(path=key, **record)) + b'\n' for key, record in hashes.items()))
+        compacted.replace(constants.HASHES_FILE)
+    return hashes
+
+
+def _store_md5(key, stat, md5):
+    # appends a single line instead of rewriting every recorded hash
+    record = json_dumps(dict(path=key, size=stat.st_size, mtime_ns=stat.st_mtime_ns, md5=md5))
+    with _HASHES_LOCK:
+        with constants.HASHES_FILE.open('ab') as f:
+            f.write(record + b'\n')
+
+
+def chunk_count(size, chunk_size=constants.DEFAULT_CHUNK_SIZE):
+    """ Returns the number of byte ranges calculate_chunks splits size bytes into
+
+    :type size: int
+    :type chunk_size: int
+    :rtype: int
+    """
+    return -(-size // chunk_size)
+
+
+def calculate_chunks(size, chunk_size=constants.DEFAULT_CHUNK_SIZE):
+    """ Yields inclusive (start, end) byte ranges that cover size bytes
+
+    :type size: int
+    :type chunk_size: int
+    :rtype: collections.abc.Iterator[tuple[int, int]]
+    """
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size) - 1
+
+
+def _seek_write(fd, data, offset):
+    # the descriptor belongs to a single range worker, so its file position is not shared
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+
+_write_at = getattr(os, 'pwrite', _seek_write)
+
+
+def _preallocate(fd, size):
+    """ Reserves size bytes for the file so parallel chunk writes don't grow and fragment it """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:  # the filesystem doesn't support it
+            pass
+
+    os.ftruncate(fd, size)
+
+
+def download_chunk(url, destination, chunk, retries=constants.DOWNLOAD_RETRIES, response=None, if_range=None):
+    """ Downloads the inclusive byte range chunk of the url into the destination file at the same offset.
+    Resumes from the last written byte on transient failures, backing off exponentially between attempts.
+
+    :param url: url of a server that supports range requests
+    :param destination: existing destination file pre-allocated to the complete size
+    :param chunk: inclusive (start, end) byte range
+    :param retries: how many times to resume the range after a failure
+    :param response: an already opened partial response for the chunk to read first instead of requesting it
+    :param if_range: ETag or Last-Modified of the file, so a range of a since changed file fails instead of mixing in
+    """
+    start, end = chunk
+    fd = os.open(str(destination), os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        _download_range(url, fd, start, end, retries, response, if_range)
+    finally:
+        os.close(fd)
+
+
+def _download_range(url, fd, start, end, retries, response, if_range=None):
+    position = start
+    write_at = _write_at
+    read_size = constants.STREAM_READ_SIZE
+    for attempt in range(retries + 1):
+        try:
+            if response is None:
+                headers = {**_BINARY_HEADERS, 'Range': f'bytes={position}-{end}'}
+                if if_range is not None:
+                    headers['If-Range'] = if_range
+                response = _SESSION.get(url, headers=headers, stream=True, timeout=constants.DOWNLOAD_TIMEOUT)
+
+            with response:
+                if response.status_code != 206:
+                    raise requests.HTTPError(f"Expected a partial response, got {response.status_code}",
+                                             response=response)
+
+                for data in response.iter_content(chunk_size=read_size):
+                    # a write may be short, the rest of the data goes right after what was written
+                    data = memoryview(data)
+                    while data:
+                        written = write_at(fd, data, position)
+                        data = data[written:]
+                        position += written
+        except requests.RequestException as e:
+            if attempt == retries:
+                raise
+
+            log.debug("Resuming '%s' range %s-%s after %s %s", url, position, end, type(e), e)
+        finally:
+            response = None
+
+        if position > end:
             log.printer('.', end='', color=False)
+            return
+
+        if attempt < retries:
+            # back off exponentially so a throttling or restarting server gets time to recover
+            time.sleep(constants.DOWNLOAD_RETRY_DELAY * 2 ** attempt)
+
+    raise IOError(f"Couldn't download '{url}' range {start}-{end}: got {position - start} bytes")
+
+
+def _content_range_size(response):
+    """ Returns the complete size from the 'Content-Range: bytes start-end/size' header or None if it is unknown """
+    size = response.headers.get('Content-Range', '').rpartition('/')[2]
+    return int(size) if size.isdigit() else None
+
+
+def _if_range(response):
+    """ Returns the validator to pin the remaining range requests to the entity of the response, if it has one """
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):  # If-Range only allows strong etags
+        return etag
 
+    return response.headers.get('Last-Modified')
+
+
+def _download_ranged(url, destination, headers=None):
+    """ Downloads the url in parallel byte ranges directly into the pre-allocated destination file.
+    The first range request doubles as the probe: a partial response carries the complete size and the first chunk,
+    while a server that ignores ranges answers with the whole file, which is streamed as is.
+
+    :param headers: extra headers of the first request, e.g. conditional ones
+    :return: the first response, which is a 304 one if the conditional headers say the url is not modified
+    """
+    first_headers = {**_BINARY_HEADERS, **(headers or {}), 'Range': f'bytes=0-{constants.DEFAULT_CHUNK_SIZE - 1}'}
+    response = _SESSION.get(url, headers=first_headers, stream=True, timeout=constants.DOWNLOAD_TIMEOUT)
+    if response.status_code == 304:
+        response.close()
+        return response
+
+    if response.status_code != 206:
+        if response.status_code == 416:  # an empty file has no satisfiable range
+            response.close()
+            response = None
+        return _download_single(url, destination, response=response, headers=headers)
+
+    size = _content_range_size(response)
+    if not size:
+        response.close()
+        return _download_single(url, destination, headers=headers)
+
+    # the other chunks request the final url so they don't follow the redirects again
+    final_url = response.url
+    num_chunks = chunk_count(size)
+    log.debug("Downloading '%s' of %s bytes in %s chunks", url, size, num_chunks)
+    with response:
+        fd = os.open(str(destination), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+        try:
+            _preallocate(fd, size)
+        finally:
+            os.close(fd)
+
+        chunks = calculate_chunks(size)
+        download = partial(download_chunk, final_url, destination, if_range=_if_range(response))
+        with ThreadPoolExecutor(max_workers=min(num_chunks, constants.DOWNLOAD_WORKERS)) as executor:
+            try:
+                first_chunk = executor.submit(download, next(chunks), response=response)
+                list(executor.map(download, chunks))
+                first_chunk.result()
+            except BaseException:
+                # the download is lost anyway, don't wait for the ranges that haven't started yet
+                executor.shutdown(cancel_futures=True)
+                raise
+    return response
+
+
+def _download_single(url, destination, response=None, headers=None):
+    """ Streams the url to the destination file
+
+    :param headers: extra request headers, e.g. conditional ones
+    :return: the response, which is a 304 one if the conditional headers say the url is not modified
+    """
+    if response is None:
+        response = _SESSION.get(url, headers={**_BINARY_HEADERS, **(headers or {})}, stream=True,
+                                timeout=constants.DOWNLOAD_TIMEOUT)
+
+    last_progress = time.monotonic()
+    with response:
+        if response.status_code == 304:
+            return response
+
+        response.raise_for_status()
+        with open(destination, 'wb') as f:
+            for data in response.iter_content(chunk_size=constants.STREAM_READ_SIZE):
+                f.write(data)
+                # print and flush at most once per PROGRESS_INTERVAL, whatever the transfer rate
+                now = time.monotonic()
+                if now - last_progress >= constants.PROGRESS_INTERVAL:
+                    last_progress = now
+                    log.printer('.', end='', color=False)
+    return response
+
+
+def _download_file(source, destination, chunked=True, headers=None):
+    """ Returns the response the destination was downloaded from or None if the download failed """
     log.printer(f"Downloading '{source}' to '{destination}'", end='', color=False)
     try:
-        urlretrieve(source, str(destination), basic_progress)
+        if chunked:
+            response = _download_ranged(source, destination, headers=headers)
+        else:
+            response = _download_single(source, destination, headers=headers)
     except Exception as e:
         log.error(f"Error downloading '{source}' to '{destination}'\n{type(e)} {e}")
+        # a preallocated or partially written file would pass for a complete one
+        Path(destination).unlink(missing_ok=True)
+        return None
+
+    log.printer('Not modified' if response.status_code == 304 else 'Done', color=False)
+    return response
+
+
+def download_file_from_url(source, destination, chunked=True):
+    if _download_file(source, destination, chunked=chunked) is None:
         return None
 
-    log.printer('Done', color=False)
     return Path(destination)
 
 
+_DOWNLOADS_CACHE_LOCK = threading.Lock()
+
+
+def download_if_modified(url, destination, chunked=True):
+    """ Downloads the url to the destination unless the server reports it as not modified since the previous call.
+    A single conditional request both checks the url and starts the download.
+
+    :return: md5 of the url content: the recorded one if the url is not modified, otherwise the one of the downloaded
+             destination; None if the download failed
+    :rtype: str | None
+    """
+    with _DOWNLOADS_CACHE_LOCK:
+        cached = _read_json_cache(constants.DOWNLOADS_CACHE_FILE).get(url)
+
+    headers = {}
+    if cached is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = _download_file(url, destination, chunked=chunked, headers=headers)
+    if response is None:
+        return None
+
+    if response.status_code == 304:
+        if cached is None:  # not modified since conditions that weren't sent
+            log.warning(f"Unexpected '304 Not Modified' for '{url}'")
+            return None
+
+        log.debug("Url '%s' is not modified since the last download", url)
+        return cached['md5']
+
+    output = md5sum(destination)
+    # the validators come from the very response that was written to the destination
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if output is not None and (etag or last_modified):
+        record = dict(etag=etag, last_modified=last_modified, md5=output)
+    else:  # the server sent no validators to check the url against
+        record = None
+
+    if record != cached:
+        with _DOWNLOADS_CACHE_LOCK:
+            cache = _read_json_cache(constants.DOWNLOADS_CACHE_FILE)
+            if record is None:
+                cache.pop(url, None)
+            else:
+                cache[url] = record
+            constants.ensure_temp_folder()
+            constants.DOWNLOADS_CACHE_FILE.write_bytes(json_dumps(cache))
+    return output
+
+
+@lru_cache(maxsize=256)
 def url_to_filename(url):
     parse = urlparse(url)
     base = os.path.basename(parse.path)
-    suffix = Path(base).suffix
-    if suffix == '':
+    suffix = os.path.splitext(base)[1]
+    if suffix in ('', '.'):
         log.warning(f"Cannot get filename from url '{url}'. No dot in base '{parse.path}'")
         return None
 
@@ -202,19 +629,153 @@ def url_to_filename(url):
 
 
 def read_url(url):
-    fp = urllib.request.urlopen(url)
-    mybytes = fp.read()
-    output = mybytes.decode("utf8").strip()
-    fp.close()
+    response = _SESSION.get(url, timeout=constants.DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    output = response.content.decode("utf8").strip()
     return output
 
 
+def _zip_member_path(member, destination):
+    """ Returns a sanitized extraction path of the zip member the same way zipfile.ZipFile.extract does
+
+    :type member: zipfile.ZipInfo
+    :type destination: str
+    :rtype: str
+    """
+    arcname = member.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(part for part in arcname.split(os.path.sep) if part not in invalid_path_parts)
+    if os.path.sep == '\\':
+        # filter characters that are illegal on Windows, e.g. ':' would write to an alternate data stream
+        arcname = zipfile.ZipFile._sanitize_windows_name(arcname, os.path.sep)
+
+    if not arcname and not member.is_dir():
+        raise ValueError("Empty filename.")
+
+    return os.path.normpath(os.path.join(destination, arcname))
+
+
+def _zip_member_data_offset(_zip, member):
+    """ Returns the offset of the zip member raw data inside the archive file
+
+    :type _zip: zipfile.ZipFile
+    :type member: zipfile.ZipInfo
+    :rtype: int
+    """
+    _zip.fp.seek(member.header_offset)
+    header = _zip.fp.read(zipfile.sizeFileHeader)
+    filename_length, extra_length = struct.unpack('<HH', header[26:30])
+    return member.header_offset + zipfile.sizeFileHeader + filename_length + extra_length
+
+
+def _sendfile(dst, src, offset, count):
+    """ Copies count bytes from the src file starting at offset to dst using the kernel zero-copy path
+
+    :return: True if everything was copied, False if os.sendfile is not usable for these files
+    """
+    if not hasattr(os, 'sendfile'):
+        return False
+
+    sent = 0
+    try:
+        while sent < count:
+            chunk = os.sendfile(dst.fileno(), src.fileno(), offset + sent, count - sent)
+            if chunk == 0:
+                break
+            sent += chunk
+    except OSError:
+        if sent:
+            raise
+        return False
+
+    return sent == count
+
+
+def _crc32_range(fd, offset, count):
+    """ Returns the CRC-32 of count bytes of the file descriptor starting at offset """
+    crc = 0
+    end = offset + count
+    while offset < end:
+        data = os.pread(fd, min(constants.ZIP_COPY_BUFSIZE, end - offset), offset)
+        if not data:
+            break
+        crc = zlib.crc32(data, crc)
+        offset += len(data)
+    return crc
+
+
 def unzip_file(source, destination, members=None, password=None):
     with zipfile.ZipFile(str(source), 'r') as _zip:
-        log.debug(f"Unzipping '{source}' to '{destination}'")
-        _zip.extractall(str(destination), members=members, pwd=password)
+        log.debug("Unzipping '%s' to '%s'", source, destination)
+        # member paths are plain strings: building a Path per member costs more than the extraction of small files
+        destination = os.fspath(destination)
+        folders = set()
+        files = []
+        for member in _zip.infolist() if members is None else members:
+            if not isinstance(member, zipfile.ZipInfo):
+                member = _zip.getinfo(member)
+
+            member_path = _zip_member_path(member, destination)
+            folder = member_path if member.is_dir() else os.path.dirname(member_path)
+            # folders are created upfront, so the extraction workers don't race creating them
+            if folder not in folders:
+                os.makedirs(folder, exist_ok=True)
+                folders.add(folder)
+
+            if not member.is_dir():
+                files.append((member, member_path))
+
+        # members extracting to the same path would race on different workers, keep the last one like extractall does
+        files = list({os.path.normcase(member_path): (member, member_path) for member, member_path in files}.values())
+        workers = min(len(files), constants.UNZIP_WORKERS, available_cpus())
+        if len(files) <= constants.UNZIP_PARALLEL_THRESHOLD or workers == 1:
+            _unzip_members(_zip, files, password)
+            return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batches = (files[worker::workers] for worker in range(workers))
+        list(executor.map(partial(_unzip_members_from, source, password=password), batches))
+
+
+def _unzip_members_from(source, files, password=None):
+    # a ZipFile can't be read from several threads at once, so every worker opens the archive on its own
+    with zipfile.ZipFile(str(source), 'r') as _zip:
+        _unzip_members(_zip, files, password)
+
+
+def _unzip_members(_zip, files, password=None):
+    for member, member_path in files:
+        with open(member_path, 'wb') as dst:
+            # the size is known upfront, so large members get their blocks reserved at once instead of growing
+            if member.file_size > constants.ZIP_COPY_BUFSIZE:
+                _preallocate(dst.fileno(), member.file_size)
+
+            # stored unencrypted members are copied from the archive as is, skipping user-space
+            if member.compress_type == zipfile.ZIP_STORED and not member.flag_bits & 0x1:
+                offset = _zip_member_data_offset(_zip, member)
+                if _sendfile(dst, _zip.fp, offset, member.file_size):
+                    # sendfile bypasses ZipExtFile, so check the CRC the way it would have
+                    if _crc32_range(_zip.fp.fileno(), offset, member.file_size) != member.CRC:
+                        raise zipfile.BadZipFile(f"Bad CRC-32 for file {member.filename!r}")
+                    continue
+
+                # sendfile may have stopped part way, start the regular copy over
+                dst.seek(0)
+                dst.truncate()
+
+            with _zip.open(member, pwd=password) as src:
+                shutil.copyfileobj(src, dst, length=constants.ZIP_COPY_BUFSIZE)
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
 
 
 def is_filename_archive(filename):
-    archive_exts = ('.zip', '.7z', '.rar')
-    return any([ext for ext in archive_exts if ext in filename])
+    return filename.lower().endswith(constants.ARCHIVE_EXTENSIONS)
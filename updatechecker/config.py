@@ -1,8 +1,9 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 
 from typing import Optional, Union
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, TypeAdapter, field_validator
 from dynaconf import Dynaconf, Validator, ValidationError
 from urllib.parse import urlparse
 
@@ -11,15 +12,12 @@ config_filename = f'{config_dirname}.yaml'
 default_config_dir = f"{os.getenv('USERPROFILE', '~')}".replace('\\', '/')
 default_config_filepath = f"{default_config_dir}/{config_filename}"
 
-if not os.path.exists(default_config_dir):
-    os.makedirs(default_config_dir)
-
 
 class Entry(BaseModel):
     name: str
     url: str
     md5: Optional[str] = None
-    target: str
+    target: Path
     git_asset: Optional[str] = None
     unzip_target: Optional[str] = None
     kill_if_locked: Optional[Union[str, bool]] = False
@@ -27,14 +25,13 @@ class Entry(BaseModel):
     launch: Optional[str] = None
     arguments: Optional[str] = None
     archive_password: Optional[str] = None
+    chunked_download: Optional[bool] = True
 
     @field_validator('unzip_target')
     def validate_unzip_target(cls, v: str):
-        if v:
-            v = Path(v)
-            if not v.exists() or not v.is_dir():
-                raise ValueError(f"unzip_target '{v}' must be an existing directory")
-            v = str(v)
+        # a single stat on the string as is: isdir() is False for a missing path as well
+        if v and not os.path.isdir(v):
+            raise ValueError(f"unzip_target '{v}' must be an existing directory")
         return v
 
     @field_validator('url')
@@ -49,10 +46,31 @@ class Entry(BaseModel):
         return v
 
 
+_ENTRIES_ADAPTER = TypeAdapter(list[Entry])
+
+
+def parse_entries(entries):
+    """ Returns the Entry models of the config entries mapping, validated in a single call
+
+    :type entries: dict
+    :rtype: list[Entry]
+    """
+    return _ENTRIES_ADAPTER.validate_python([{**entry, 'name': entry_name} for entry_name, entry in entries.items()])
+
+
+@lru_cache(maxsize=256)
+def _validate_entry(entry_items: tuple):
+    Entry(**dict(entry_items))
+    return True
+
+
 def entry_validator(entries):
-    for entry_name in entries.keys():
-        entry = entries[entry_name]
-        Entry(**entry, name=entry_name)
+    for entry_name, entry in entries.items():
+        entry_items = tuple(sorted({**entry, 'name': entry_name}.items()))
+        try:
+            _validate_entry(entry_items)
+        except TypeError:  # unhashable entry values, validate without the cache
+            Entry(**entry, name=entry_name)
 
     return True
 
@@ -87,20 +105,36 @@ config_kwargs = dict(
     # ],
     validators=validators,
 )
-config = Dynaconf(
-    env='updatechecker',
-    root_path=default_config_dir,
-    settings_files=[
-        default_config_filepath,
-        f"./{config_filename}",
-    ],
-    **config_kwargs,
-)
+
+
+@lru_cache(maxsize=1)
+def get_config():
+    """ Returns the user config, creating it on first use instead of on import """
+    if not os.path.exists(default_config_dir):
+        os.makedirs(default_config_dir)
+
+    return Dynaconf(
+        env='updatechecker',
+        root_path=default_config_dir,
+        settings_files=[
+            default_config_filepath,
+            f"./{config_filename}",
+        ],
+        **config_kwargs,
+    )
+
+
+def __getattr__(name):
+    # keeps `from updatechecker.config import config` working
+    if name == 'config':
+        return get_config()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
     try:
-        config.validators.validate_all()
+        get_config().validators.validate_all()
     except ValidationError as e:
         accumulative_errors = e.details
         print(accumulative_errors)
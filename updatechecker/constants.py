@@ -3,17 +3,53 @@ from pathlib import Path
 
 ROOT_FOLDER = Path(__file__).parent.parent.absolute()
 TEMP_FOLDER = ROOT_FOLDER / 'temp/'
-if not TEMP_FOLDER.exists():
-    TEMP_FOLDER.mkdir()
+_temp_folder_created = False
+
+
+def ensure_temp_folder():
+    global _temp_folder_created
+    if not _temp_folder_created:
+        TEMP_FOLDER.mkdir(parents=True, exist_ok=True)
+        _temp_folder_created = True
+    return TEMP_FOLDER
+
 
 LOGS_FOLDER = ROOT_FOLDER / 'logs/'
-if not LOGS_FOLDER.exists():
-    LOGS_FOLDER.mkdir()
+_logs_folder_created = False
+
+
+def ensure_logs_folder():
+    global _logs_folder_created
+    if not _logs_folder_created:
+        LOGS_FOLDER.mkdir(parents=True, exist_ok=True)
+        _logs_folder_created = True
+    return LOGS_FOLDER
+
+
+RELEASES_CACHE_FILE = TEMP_FOLDER / 'releases.json'
+DOWNLOADS_CACHE_FILE = TEMP_FOLDER / 'downloads.json'
 
 CONFIG_FILE = ROOT_FOLDER / 'config.json'
-HASHES_FILE = ROOT_FOLDER / 'hashes.json'
+HASHES_FILE = ROOT_FOLDER / 'hashes.jsonl'
+
+DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_RETRY_DELAY = 1
+DOWNLOAD_TIMEOUT = 30
+STREAM_READ_SIZE = 1 << 20
+HTTP_POOL_SIZE = 32
+PROGRESS_INTERVAL = 0.5
+GITHUB_RATE_LIMIT_MAX_WAIT = 300
+
+ARCHIVE_EXTENSIONS = ('.zip', '.7z', '.rar')
+ZIP_COPY_BUFSIZE = 1 << 20
+UNZIP_WORKERS = 4
+UNZIP_PARALLEL_THRESHOLD = 4
 
 LOGGER_MESSAGE_FORMAT = '%(asctime)s.%(msecs)03d %(lineno)3s:%(name)-22s %(levelname)-6s %(message)s'
 LOGGER_COLORED_MESSAGE_FORMAT = '%(log_color)s%(message)s'
 LOGGER_DATE_FORMAT = '%H:%M:%S'
 MAX_LOG_FILES = 10
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 5
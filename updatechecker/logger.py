@@ -7,9 +7,8 @@ import os
 import pprint
 import re
 import sys
+import threading
 import time
-# noinspection PyCompatibility
-from pathlib import Path
 
 from updatechecker import constants
 
@@ -19,6 +18,42 @@ class InfoFilter(logging.Filter):
         return rec.levelno <= logging.INFO
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """ FileHandler that lets the file buffer collect records instead of flushing every record.
+    Flushes on warnings and errors, and otherwise at most once per LOG_FLUSH_INTERVAL seconds,
+    including when no records come in, e.g. during a long download.
+    """
+
+    def __init__(self, filename, **kwargs):
+        self._last_flush = time.monotonic()
+        self._stop_flushing = threading.Event()
+        super().__init__(filename, **kwargs)
+        threading.Thread(target=self._flush_periodically, name='log-flush', daemon=True).start()
+
+    def _flush_periodically(self):
+        while not self._stop_flushing.wait(constants.LOG_FLUSH_INTERVAL):
+            self.flush(force=True)
+
+    def close(self):
+        self._stop_flushing.set()
+        super().close()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=constants.LOG_BUFFER_SIZE, encoding=self.encoding,
+                    errors=self.errors)
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.WARNING:
+            self.flush(force=True)
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if force or now - self._last_flush >= constants.LOG_FLUSH_INTERVAL:
+            self._last_flush = now
+            super().flush()
+
+
 class PrettyLog:
     def __init__(self, obj):
         self.obj = obj
@@ -27,6 +62,9 @@ class PrettyLog:
         if isinstance(self.obj, str):
             return self.obj
 
+        if hasattr(self.obj, 'model_dump'):
+            return pprint.pformat(self.obj.model_dump())
+
         return pprint.pformat(self.obj)
 
 
@@ -35,6 +73,20 @@ class Struct:
         self.__dict__.update(entries)
 
 
+ANSI_ESCAPE_RE = re.compile(r'\x1b(?:\[[^@-~]*?[@-~]|\].*?(?:\x07|\x1b\\))')
+
+
+def strip_ansi(text):
+    if '\x1b' not in text:
+        return text
+
+    return ANSI_ESCAPE_RE.sub('', text)
+
+
+FORMATTER = logging.Formatter(constants.LOGGER_MESSAGE_FORMAT, datefmt=constants.LOGGER_DATE_FORMAT)
+COLOR_FORMATTER = ColoredFormatter(fmt=constants.LOGGER_COLORED_MESSAGE_FORMAT, datefmt=constants.LOGGER_DATE_FORMAT,
+                                   reset=True, log_colors=default_log_colors)
+
 LOGGER_DEFAULT_LEVEL = logging.INFO
 LOGGER_LEVELS_DICT = {'CRITICAL': logging.CRITICAL,
                       'ERROR': logging.ERROR,
@@ -49,6 +101,7 @@ class Log(object):
     levels = LOGGER_LEVELS
     default_level = LOGGER_DEFAULT_LEVEL
     log_session_filename = None
+    _filehandler = None
 
     @staticmethod
     def set_global_log_level(level):
@@ -73,32 +126,32 @@ class Log(object):
         self.critical = self.log.critical
         self.exception = self.log.exception
 
-        if not (Path(constants.LOGS_FOLDER).exists() and Path(constants.LOGS_FOLDER).is_dir()):
-            os.mkdir(str(constants.LOGS_FOLDER))
-
         if Log.log_session_filename is None:
             Log.log_session_filename = "%s.log" % datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
             self.clean_logs_folder()
 
-        formatter = logging.Formatter(constants.LOGGER_MESSAGE_FORMAT, datefmt=constants.LOGGER_DATE_FORMAT)
-        color_formatter = ColoredFormatter(fmt=constants.LOGGER_COLORED_MESSAGE_FORMAT,
-                                           datefmt=constants.LOGGER_DATE_FORMAT, reset=True,
-                                           log_colors=default_log_colors)
-
         self.stdout_handler = logging.StreamHandler(sys.stdout)
         self.stdout_handler.addFilter(InfoFilter())
         self.log.addHandler(self.stdout_handler)
-        self.stdout_handler.setFormatter(color_formatter)
+        self.stdout_handler.setFormatter(COLOR_FORMATTER)
 
         self.stderr_handler = logging.StreamHandler(sys.stderr)
         self.log.addHandler(self.stderr_handler)
-        self.stderr_handler.setFormatter(color_formatter)
-
-        log_file_full_path = Path(constants.LOGS_FOLDER) / Log.log_session_filename
-        self.filehandler = logging.FileHandler(str(log_file_full_path))
-        self.filehandler.setFormatter(formatter)
+        self.stderr_handler.setFormatter(COLOR_FORMATTER)
+
+        # all loggers share one handler, so the buffered session log keeps the records in order
+        if Log._filehandler is None:
+            log_file_full_path = constants.ensure_logs_folder() / Log.log_session_filename
+            Log._filehandler = BufferedFileHandler(str(log_file_full_path))
+            Log._filehandler.setFormatter(FORMATTER)
+        self.filehandler = Log._filehandler
         self.log.addHandler(self.filehandler)
 
+        # the file log records everything, only the stdout level follows the level setter
+        self.log.setLevel(logging.DEBUG)
+        self.filehandler.setLevel(logging.DEBUG)
+        self.stderr_handler.setLevel(logging.WARNING)
+
         self.level = level
         Log.loggers[self.name] = self
 
@@ -136,20 +189,21 @@ class Log(object):
     @level.setter
     def level(self, value):
         Log.default_level = value
-        self.log.setLevel(logging.DEBUG)
-        self.filehandler.setLevel(logging.DEBUG)
-        self.stdout_handler.setLevel(value)
-        self.stderr_handler.setLevel(logging.WARNING)
+        if self.stdout_handler.level != value:
+            self.stdout_handler.setLevel(value)
 
     @staticmethod
     def clean_logs_folder():
-        log_files = sorted(list(Path(constants.LOGS_FOLDER).glob('*.log')), key=lambda f: f.stat().st_ctime,
-                           reverse=True)
+        with os.scandir(constants.ensure_logs_folder()) as entries:
+            log_files = [(entry.stat().st_ctime, entry.path) for entry in entries
+                         if entry.name.endswith('.log') and entry.is_file()]
         if len(log_files) > constants.MAX_LOG_FILES:
-            try:
-                [os.remove(str(_file)) for _file in log_files[constants.MAX_LOG_FILES:]]
-            except:
-                pass
+            log_files.sort(reverse=True)
+            for _, log_file in log_files[constants.MAX_LOG_FILES:]:
+                try:
+                    os.remove(log_file)
+                except OSError:
+                    pass
 
     def printer(self, *message, **kwargs):
         # for exception in EXCEPTIONS:
@@ -165,14 +219,15 @@ class Log(object):
             timestamp = '' if end == '' else '%s ' % time.strftime("%H:%M:%S")
 
             _timestamped_message = '%s%s' % (timestamp, msg)
-            _cleared_timestamped_message = re.sub(r'\x1b(\[.*?[@-~]|\].*?(\x07|\x1b\\))', '', _timestamped_message)
+            _cleared_timestamped_message = strip_ansi(_timestamped_message)
 
-            self.filehandler.stream.write(_cleared_timestamped_message)
-            self.filehandler.flush()
+            # the file handler and its buffered stream are shared with the other loggers and threads
+            with self.filehandler.lock:
+                self.filehandler.stream.write(_cleared_timestamped_message)
 
             _cleared_message = msg
             if clear is True:
-                _cleared_message = re.sub(r'\x1b(\[.*?[@-~]|\].*?(\x07|\x1b\\))', '', msg)
+                _cleared_message = strip_ansi(msg)
 
             _colored_msg = _cleared_message
             if color is True: